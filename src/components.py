@@ -1,10 +1,11 @@
-from src.ecs import Component
+from src.ecs import Component, TrackedComponent
+from src.sprite_utils import SpriteLoader
 from pygame import Vector2, image, Surface, Rect
 import pygame
 from typing import Optional, Dict
 
 
-class State(Component):
+class State(TrackedComponent):
     '''
     Component that stores data about states of an object.
     '''
@@ -31,7 +32,7 @@ class Collider(Component):
         self.collision_types = collision_types
 
 
-class Transform(Component):
+class Transform(TrackedComponent):
     '''
     Component that stores position, rotation and scale of an object.
     '''
@@ -46,7 +47,7 @@ class Transform(Component):
         self.scale: Vector2 = Vector2(1, 1)
 
 
-class Velocity(Component):
+class Velocity(TrackedComponent):
     '''
     Component that stores object movement.
     '''
@@ -109,3 +110,40 @@ class Health(Component):
         self.current_hp: int = max_hp
         self.invulnerable: bool = False
         self.invulnerability_timer: float = 0.0
+
+
+class ParticleEmitter(Component):
+    '''
+    Component that spawns particles around an object.
+    Particles are not entities, they are stored and updated by ParticleSystem.
+    '''
+
+    def __init__(self,
+                 frames: Optional[list[Surface]] = None,
+                 color: tuple = (255, 255, 255),
+                 size: tuple = (4, 4),
+                 rate: float = 100.0,
+                 lifetime: tuple = (0.5, 1.0),
+                 speed: tuple = (50.0, 150.0),
+                 direction: float = 0.0,
+                 spread: float = 360.0):
+
+        if min(lifetime) <= 0:
+            raise ValueError(f'Particle lifetime must be positive, got {lifetime}')
+
+        # Frames are played once over particle lifetime.
+        self.frames: list[Surface] = frames if frames else [
+            SpriteLoader.load_color_surface(color, size)]
+        # Particles spawned per second.
+        self.rate: float = rate
+        # Min and max lifetime of a particle in seconds.
+        self.lifetime: tuple = lifetime
+        # Min and max speed of a particle.
+        self.speed: tuple = speed
+        # Direction and spread angle in degrees.
+        self.direction: float = direction
+        self.spread: float = spread
+        self.active: bool = True
+        # Amount of particles to spawn at once on next update.
+        self.burst: int = 0
+        self.spawn_accumulator: float = 0.0
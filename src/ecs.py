@@ -1,3 +1,63 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ChangeTracker:
+    '''
+    Log of component changes owned by a game.
+    For every component type it keeps entities ordered by the tick
+    of their last change, so recent changes can be read without
+    iterating over all entities.
+    '''
+
+    def __init__(self):
+        self.tick: int = 1
+        self.changed: dict[type, dict] = {}
+        self.added: dict[type, dict] = {}
+
+    def advance(self) -> int:
+        '''Start a new tick and return it.'''
+        self.tick += 1
+        return self.tick
+
+    def mark_changed(self, entity, component_type: type) -> None:
+        '''Record that component of the entity was changed in the current tick.'''
+        self._record(self.changed, entity, component_type)
+
+    def mark_added(self, entity, component_type: type) -> None:
+        '''Record that component was added to the entity in the current tick.'''
+        self._record(self.added, entity, component_type)
+        self._record(self.changed, entity, component_type)
+
+    def since(self, log: dict[type, dict], component_type: type, tick: int) -> list:
+        '''Get entities recorded in the log after the tick, oldest first.'''
+        entities = []
+        for entity, entity_tick in reversed(log.get(component_type, {}).items()):
+            if entity_tick <= tick:
+                break
+            entities.append(entity)
+        entities.reverse()
+        return entities
+
+    def last_tick(self, log: dict[type, dict], component_type: type, entity) -> int:
+        '''Get the tick the entity was last recorded in the log.'''
+        return log.get(component_type, {}).get(entity, 0)
+
+    def remove_entity(self, entity) -> None:
+        '''Drop the entity from all logs.'''
+        for log in (self.changed, self.added):
+            for entries in log.values():
+                entries.pop(entity, None)
+
+    def _record(self, log: dict[type, dict], entity, component_type: type) -> None:
+        # Move entity to the end of the log, so the log stays ordered by tick.
+        entries = log.setdefault(component_type, {})
+        if entries.get(entity) == self.tick:
+            return
+        entries.pop(entity, None)
+        entries[entity] = self.tick
+
+
 class Component:
     '''
     Base class for implementing Components.
@@ -6,6 +66,24 @@ class Component:
     pass
 
 
+class TrackedComponent(Component):
+    '''
+    Base class for components read by change queries.
+    Assigning a public attribute marks the component as changed
+    for every entity that has it. Changes made in place
+    (e.g. moving a Rect) should be marked with Entity.mark_changed().
+    '''
+
+    # Entities the component was added to.
+    _owners: tuple = ()
+
+    def __setattr__(self, name, value) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            for entity in self._owners:
+                entity.mark_changed(type(self))
+
+
 class Entity:
     '''
     Base class for implementing Entities.
@@ -13,15 +91,80 @@ class Entity:
 
     def __init__(self):
         self.components = {}
+        # Set when the entity is added to a game.
+        self.tracker: Optional[ChangeTracker] = None
 
     def add_component(self, component) -> None:
         '''Add component to an entity.'''
         self.components[type(component)] = component
+        if isinstance(component, TrackedComponent):
+            component._owners = component._owners + (self,)
+        if self.tracker is not None:
+            self.tracker.mark_added(self, type(component))
 
     def get_component(self, component) -> Component:
         '''Get component object that the entity has.'''
         return self.components.get(component)
 
+    def mark_changed(self, component) -> None:
+        '''Mark component of the entity as changed
+           for systems that query changes of it.'''
+        if self.tracker is not None:
+            self.tracker.mark_changed(self, component)
+
+
+class QueryFilter(ABC):
+    '''
+    Base class for filters used in System.query().
+    '''
+
+    def __init__(self, component_type: type):
+        self.component_type = component_type
+
+    @abstractmethod
+    def candidates(self, tracker: ChangeTracker, tick: int) -> list:
+        '''Get entities that may pass the filter.'''
+        pass
+
+    @abstractmethod
+    def matches(self, tracker: ChangeTracker, entity, tick: int) -> bool:
+        '''Check if entity passes the filter.'''
+        pass
+
+
+class ChangedFilter(QueryFilter):
+    '''
+    Filter entities which component was changed since the last run of a system.
+    '''
+
+    def candidates(self, tracker: ChangeTracker, tick: int) -> list:
+        return tracker.since(tracker.changed, self.component_type, tick)
+
+    def matches(self, tracker: ChangeTracker, entity, tick: int) -> bool:
+        return tracker.last_tick(tracker.changed, self.component_type, entity) > tick
+
+
+class AddedFilter(QueryFilter):
+    '''
+    Filter entities which component was added since the last run of a system.
+    '''
+
+    def candidates(self, tracker: ChangeTracker, tick: int) -> list:
+        return tracker.since(tracker.added, self.component_type, tick)
+
+    def matches(self, tracker: ChangeTracker, entity, tick: int) -> bool:
+        return tracker.last_tick(tracker.added, self.component_type, entity) > tick
+
+
+def changed(component_type: type) -> ChangedFilter:
+    '''Query filter for changed components, e.g. changed(Transform).'''
+    return ChangedFilter(component_type)
+
+
+def added(component_type: type) -> AddedFilter:
+    '''Query filter for added components, e.g. added(Sprite).'''
+    return AddedFilter(component_type)
+
 
 class System:
     '''
@@ -31,11 +174,27 @@ class System:
     def __init__(self):
         self.entities = []
         self.required_components = []
+        # Set by the game that owns the system.
+        self.tracker: Optional[ChangeTracker] = None
+        # Tick of the previous run, used by change filters.
+        self.last_run_tick: int = 0
+        self._entity_set = set()
+        # Entities registered since the previous run.
+        self._new_entities: dict = {}
 
     def register_entity(self, entity) -> None:
         '''Register entity in system.'''
         if self._check_requirements(entity):
             self.entities.append(entity)
+            self._entity_set.add(entity)
+            self._new_entities[entity] = None
+
+    def unregister_entity(self, entity) -> None:
+        '''Remove entity from system.'''
+        if entity in self._entity_set:
+            self.entities.remove(entity)
+            self._entity_set.discard(entity)
+            self._new_entities.pop(entity, None)
 
     def _check_requirements(self, entity) -> bool:
         '''Check if entity meets the requirements
@@ -43,6 +202,38 @@ class System:
         required = self.required_components
         return all(t in entity.components for t in required)
 
+    def query(self, *filters: QueryFilter) -> list:
+        '''
+        Get registered entities that pass all filters since the last run.
+        Entities registered since the last run pass any filter
+        if they have its component.
+        Only entities recorded by the first filter are checked,
+        so the cost depends on amount of changes, not on amount of entities.
+        '''
+        if not filters:
+            return list(self.entities)
+
+        entities = [entity for entity in self._new_entities
+                    if all(f.component_type in entity.components for f in filters)]
+        if self.tracker is None:
+            return entities
+
+        tick = self.last_run_tick
+        entities.extend(
+            entity for entity in filters[0].candidates(self.tracker, tick)
+            if entity in self._entity_set and entity not in self._new_entities
+            and all(f.matches(self.tracker, entity, tick) for f in filters[1:]))
+        return entities
+
+    def run(self, dt) -> None:
+        '''Update the system in its own tick.'''
+        run_tick = self.tracker.advance()
+        self.update(dt)
+        self.last_run_tick = run_tick
+        self._new_entities.clear()
+        # Changes made outside of systems get a newer tick.
+        self.tracker.advance()
+
     def update(self, dt) -> None:
         '''Processes entities registered in the system.'''
         pass
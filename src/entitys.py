@@ -54,3 +54,13 @@ class Obstacle(Entity):
             )
         )
         self.add_component(Collider())
+
+
+class Effect(Entity):
+    def __init__(self,
+                 emitter: ParticleEmitter,
+                 starting_pos: tuple = (0, 0)):
+        super().__init__()
+
+        self.add_component(emitter)
+        self.add_component(Transform(rect=Rect(starting_pos, (0, 0))))
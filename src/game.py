@@ -1,6 +1,7 @@
 import pygame
 
-from src.systems import AnimationSystem, MovementSystem, RenderSystem, InputSystem, CollisionDetectionSystem, CollisionResolutionSystem, StateSystem
+from src.ecs import ChangeTracker
+from src.systems import AnimationSystem, MovementSystem, RenderSystem, InputSystem, CollisionDetectionSystem, CollisionResolutionSystem, StateSystem, ParticleSystem
 
 
 class Game:
@@ -20,28 +21,42 @@ class Game:
         render_system = RenderSystem(screen)
         state_system = StateSystem()
         animation_system = AnimationSystem()
+        particle_system = ParticleSystem(screen)
         self.systems = [input_system,
                         movement_system,
                         state_system,
                         animation_system,
                         col_detection_system,
                         col_resolution_system,
-                        render_system,]
+                        render_system,
+                        particle_system,]
         self.entities = []
 
+        self.tracker = ChangeTracker()
+        for system in self.systems:
+            system.tracker = self.tracker
+
     def toggle_pause(self):
         self.is_paused = not self.is_paused
 
     def add_entity(self, entity):
         self.entities.append(entity)
+        entity.tracker = self.tracker
         for system in self.systems:
             system.register_entity(entity)
 
+    def remove_entity(self, entity):
+        self.entities.remove(entity)
+        for system in self.systems:
+            system.unregister_entity(entity)
+        self.tracker.remove_entity(entity)
+        entity.tracker = None
+
     def update(self, dt):
         if not self.is_paused:
             scaled_dt = dt * self.game_speed
             for system in self.systems:
-                system.update(scaled_dt)
+                system.run(scaled_dt)
         else:
             self.update_paused_state()
 
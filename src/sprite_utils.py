@@ -23,8 +23,32 @@ class AnimationData:
 class SpriteLoader:
     '''
     Utility class for loading sprites and animations of different types.
+    Loaded frames are cached, so the same folder is read from disk only once.
     '''
 
+    _frames_cache: dict[tuple, list[pygame.Surface]] = {}
+    _surfaces_cache: dict[tuple, pygame.Surface] = {}
+
+    @staticmethod
+    def load_color_surface(color: tuple, size: tuple) -> pygame.Surface:
+        '''
+        Get a surface filled with color.
+        Surfaces are cached, so objects of the same look share one surface.
+
+        Args:
+            color: fill color
+            size: size of the surface
+
+        Returns:
+            Pygame surface filled with color
+        '''
+        cache_key = (tuple(color), tuple(size))
+        if cache_key not in SpriteLoader._surfaces_cache:
+            surf = pygame.Surface(size)
+            surf.fill(color)
+            SpriteLoader._surfaces_cache[cache_key] = surf
+        return SpriteLoader._surfaces_cache[cache_key]
+
     @abstractmethod
     def load_sprite_sheet(
                           path: str,
@@ -62,6 +86,10 @@ class SpriteLoader:
             List of pygame surfaces in numerical order
             each containing animation frame
         '''
+        cache_key = (path, prefix, suffix, colorkey)
+        if cache_key in SpriteLoader._frames_cache:
+            return list(SpriteLoader._frames_cache[cache_key])
+
         frames = []
 
         try:
@@ -80,4 +108,7 @@ class SpriteLoader:
         except FileNotFoundError:
             print(f'Path not found: {path}')
 
+        if frames:
+            SpriteLoader._frames_cache[cache_key] = tuple(frames)
+
         return frames
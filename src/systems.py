@@ -1,10 +1,15 @@
-from src.components import Transform, Velocity, State, Sprite, InputTag, Collider, Animation
-from src.ecs import System, Component, Entity
+from src.components import Transform, Velocity, State, Sprite, InputTag, Collider, Animation, ParticleEmitter
+from src.ecs import System, Component, Entity, changed
 from src.events import CollisionEvent
 from src.states import IdleState, MovingState
+import numpy as np
 import pygame
 
 
+# Area entities can't leave.
+WORLD_BOUNDS = pygame.Rect(0, 0, 1920, 1080)
+
+
 class StateSystem(System):
     '''
     System that changes the states of entities.
@@ -15,7 +20,8 @@ class StateSystem(System):
         self.required_components = [State]
 
     def update(self, dt: float) -> None:
-        for entity in self.entities:
+        # States depend only on velocity, so skip entities which velocity didn't change.
+        for entity in self.query(changed(Velocity)):
             state_comp: Component = entity.get_component(State)
 
             current_states_status: list = state_comp.states
@@ -44,9 +50,12 @@ class StateSystem(System):
         else:
             is_idling = True
 
-        current_states_status['idle'] = is_idling
-        current_states_status['moving'] = moving_directions if moving_directions != set(
-        ) else None
+        moving_directions = moving_directions if moving_directions != set() else None
+
+        if current_states_status['idle'] != is_idling or current_states_status['moving'] != moving_directions:
+            current_states_status['idle'] = is_idling
+            current_states_status['moving'] = moving_directions
+            entity.mark_changed(State)
 
     def _handle_attacking_states(self, entity):
         pass
@@ -79,7 +88,9 @@ class InputSystem(System):
             direction = direction.normalize()
         else:
             direction = pygame.Vector2()
-        velocity.direction = direction
+
+        if velocity.direction != direction:
+            velocity.direction = direction
 
     def _handle_attack_input(self, entity: Entity) -> None:
 
@@ -99,18 +110,34 @@ class MovementSystem(System):
     def __init__(self):
         super().__init__()
         self.required_components = [Transform, Velocity]
+        # Entities with non zero velocity.
+        self.moving: dict[Entity, None] = {}
 
     def update(self, dt: float) -> None:
-        for entity in self.entities:
+        for entity in self.query(changed(Velocity)):
+            velocity = entity.get_component(Velocity)
+            if velocity.direction.length() > 0 and velocity.speed != 0:
+                self.moving[entity] = None
+            else:
+                self.moving.pop(entity, None)
+
+        for entity in self.moving:
             transform = entity.get_component(Transform)
             velocity = entity.get_component(Velocity)
 
+            previous_center = transform.hitbox.center
             transform.hitbox.center += velocity.direction * velocity.speed * dt
 
             # Limit exiting beyond the screen.
-            transform.hitbox.clamp_ip(pygame.Rect(0, 0, 1920, 1080))
+            transform.hitbox.clamp_ip(WORLD_BOUNDS)
+
+            if transform.hitbox.center != previous_center:
+                transform.rect.center = transform.hitbox.center
+                entity.mark_changed(Transform)
 
-            transform.rect.center = transform.hitbox.center
+    def unregister_entity(self, entity) -> None:
+        super().unregister_entity(entity)
+        self.moving.pop(entity, None)
 
 
 class AnimationSystem(System):
@@ -123,14 +150,14 @@ class AnimationSystem(System):
         self.required_components = [Sprite, Animation]
 
     def update(self, dt: float) -> None:
+        # Animation is selected only when state changes.
+        for entity in self.query(changed(State)):
+            self._select_animation(entity.get_component(Animation),
+                                   entity.get_component(State))
+
         for entity in self.entities:
             sprite: Component = entity.get_component(Sprite)
             animation: Component = entity.get_component(Animation)
-
-            if entity.get_component(State) is not None:
-                state: Component = entity.get_component(State)
-                self._select_animation(animation, state)
-
             self._update_animation_frame(animation, sprite, dt)
 
     def _select_animation(self, animation: Component, state: Component):
@@ -174,8 +201,10 @@ class AnimationSystem(System):
                     animation.current_frame -= 1
 
         current_frame: pygame.Surface = current_animation_data.frames[animation.current_frame]
-        sprite.surface = current_frame
-        sprite.mask = pygame.mask.from_surface(current_frame)
+        # Rebuild mask only when the frame is actually switched.
+        if sprite.surface is not current_frame:
+            sprite.surface = current_frame
+            sprite.mask = pygame.mask.from_surface(current_frame)
 
 
 class CollisionDetectionSystem(System):
@@ -192,7 +221,8 @@ class CollisionDetectionSystem(System):
     def update(self, dt: float) -> None:
         self.events.clear()
 
-        for ent_a in self.entities:
+        # Only moved entities can start colliding.
+        for ent_a in self.query(changed(Transform)):
             # Get only entities that can move.
             if not (Velocity in ent_a.components):
                 continue
@@ -226,11 +256,9 @@ class CollisionResolutionSystem(System):
         self.detection_system = detection_system
 
     def update(self, dt: float) -> None:
+        # Detection system emits events only for movable entities with Transform.
         for event in self.detection_system.events:
             ent_a, ent_b = event.entity_a, event.entity_b
-            if not (Transform in ent_a.components) or not (Velocity in ent_a.components):
-                continue
-
             trans_a = ent_a.get_component(Transform)
             trans_b = ent_b.get_component(Transform)
 
@@ -250,6 +278,7 @@ class CollisionResolutionSystem(System):
                 trans_a.hitbox.y += sign * overlap_y
 
             trans_a.rect.center = trans_a.hitbox.center
+            ent_a.mark_changed(Transform)
 
 
 class RenderSystem(System):
@@ -268,3 +297,199 @@ class RenderSystem(System):
             transform = entity.get_component(Transform)
             sprite = entity.get_component(Sprite)
             self.screen.blit(sprite.surface, transform.rect)
+
+
+class FrameRange:
+    '''
+    Slots of emitter frames in the frame table of ParticleSystem.
+    It is not a component, but a helper class for ParticleSystem.
+    '''
+
+    def __init__(self, key: tuple, start: int, count: int):
+        self.key: tuple = key
+        self.start: int = start
+        self.count: int = count
+        # Amount of registered emitters using the frames.
+        self.users: int = 0
+
+
+class ParticleSystem(System):
+    '''
+    System that spawns, updates and draws particles of emitters.
+    Particles are stored in preallocated arrays instead of entities.
+    '''
+
+    def __init__(self, screen, capacity: int = 50000):
+        super().__init__()
+        self.screen = screen
+        self.required_components = [ParticleEmitter, Transform]
+        self.capacity: int = capacity
+        # Amount of live particles, they always occupy first slots of arrays.
+        self.count: int = 0
+
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetimes = np.ones(capacity, dtype=np.float32)
+        self.frame_starts = np.zeros(capacity, dtype=np.int32)
+        self.frame_counts = np.ones(capacity, dtype=np.int32)
+        self._arrays = (self.positions, self.velocities, self.lifetimes,
+                        self.max_lifetimes, self.frame_starts, self.frame_counts)
+
+        # Frames of all emitters, particles refer to them by index.
+        self.frames: list[pygame.Surface] = []
+        self.frame_half_sizes = np.zeros((0, 2), dtype=np.float32)
+        self._frame_ranges: dict[tuple, FrameRange] = {}
+        # Slots of frames in the table for every registered emitter.
+        self._emitter_ranges: dict[Entity, FrameRange] = {}
+        # Ranges without emitters, released when no particle uses them.
+        self._unused_ranges: list[FrameRange] = []
+        # Released slots as (start, count), reused by new frames.
+        self._free_slots: list[tuple[int, int]] = []
+
+        self.rng = np.random.default_rng()
+
+    def register_entity(self, entity) -> None:
+        super().register_entity(entity)
+        if entity in self._entity_set:
+            # Frames are read once, on registration.
+            self._emitter_ranges[entity] = self._register_frames(
+                entity.get_component(ParticleEmitter).frames)
+
+    def unregister_entity(self, entity) -> None:
+        super().unregister_entity(entity)
+        frame_range = self._emitter_ranges.pop(entity, None)
+        if frame_range is not None:
+            frame_range.users -= 1
+            if frame_range.users == 0:
+                self._unused_ranges.append(frame_range)
+
+    def update(self, dt: float) -> None:
+        self._update_particles(dt)
+        self._release_unused_frames()
+
+        for entity in self.entities:
+            self._emit(entity, dt)
+
+        self._draw()
+
+    def _register_frames(self, frames: list[pygame.Surface]) -> FrameRange:
+        # Emitters sharing the same frames share their slots in the table.
+        key = tuple(id(frame) for frame in frames)
+        frame_range = self._frame_ranges.get(key)
+
+        if frame_range is None:
+            start = self._allocate_slots(len(frames))
+            end = start + len(frames)
+            self.frames[start:end] = frames
+            self.frame_half_sizes[start:end] = np.array(
+                [frame.get_size() for frame in frames], dtype=np.float32) / 2
+            frame_range = FrameRange(key, start, len(frames))
+            self._frame_ranges[key] = frame_range
+        elif frame_range.users == 0:
+            self._unused_ranges.remove(frame_range)
+
+        frame_range.users += 1
+        return frame_range
+
+    def _allocate_slots(self, count: int) -> int:
+        for i, (start, free_count) in enumerate(self._free_slots):
+            if free_count >= count:
+                if free_count == count:
+                    del self._free_slots[i]
+                else:
+                    self._free_slots[i] = (start + count, free_count - count)
+                return start
+
+        start = len(self.frames)
+        self.frames.extend([None] * count)
+        self.frame_half_sizes = np.vstack(
+            (self.frame_half_sizes, np.zeros((count, 2), dtype=np.float32)))
+        return start
+
+    def _release_unused_frames(self) -> None:
+        if not self._unused_ranges:
+            return
+
+        used_starts = set(np.unique(self.frame_starts[:self.count]).tolist())
+        for frame_range in list(self._unused_ranges):
+            if frame_range.start in used_starts:
+                continue
+            self._unused_ranges.remove(frame_range)
+            del self._frame_ranges[frame_range.key]
+            end = frame_range.start + frame_range.count
+            self.frames[frame_range.start:end] = [None] * frame_range.count
+            self._free_slots.append((frame_range.start, frame_range.count))
+
+    def _update_particles(self, dt: float) -> None:
+        n = self.count
+        if n == 0:
+            return
+
+        self.lifetimes[:n] -= dt
+        self.positions[:n] += self.velocities[:n] * dt
+
+        # Move live particles to the front of arrays.
+        alive = self.lifetimes[:n] > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            for array in self._arrays:
+                array[:alive_count] = array[:n][alive]
+        self.count = alive_count
+
+    def _emit(self, entity: Entity, dt: float) -> None:
+        emitter = entity.get_component(ParticleEmitter)
+        transform = entity.get_component(Transform)
+
+        amount = emitter.burst
+        emitter.burst = 0
+        if emitter.active:
+            emitter.spawn_accumulator += emitter.rate * dt
+            spawned = int(emitter.spawn_accumulator)
+            emitter.spawn_accumulator -= spawned
+            amount += spawned
+
+        amount = min(amount, self.capacity - self.count)
+        if amount <= 0:
+            return
+
+        start, end = self.count, self.count + amount
+
+        angles = np.radians(emitter.direction + self.rng.uniform(
+            -emitter.spread / 2, emitter.spread / 2, amount))
+        speeds = self.rng.uniform(*emitter.speed, amount)
+        lifetimes = self.rng.uniform(*emitter.lifetime, amount)
+
+        self.positions[start:end] = transform.rect.center
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.lifetimes[start:end] = lifetimes
+        self.max_lifetimes[start:end] = lifetimes
+
+        frame_range = self._emitter_ranges[entity]
+        self.frame_starts[start:end] = frame_range.start
+        self.frame_counts[start:end] = frame_range.count
+
+        self.count = end
+
+    def _frame_ids(self) -> np.ndarray:
+        n = self.count
+        # Pick frame by how much of its lifetime the particle has lived.
+        age = 1 - self.lifetimes[:n] / self.max_lifetimes[:n]
+        frame_counts = self.frame_counts[:n]
+        return self.frame_starts[:n] + np.minimum(
+            (age * frame_counts).astype(np.int32), frame_counts - 1)
+
+    def _draw(self) -> None:
+        n = self.count
+        if n == 0:
+            return
+
+        frame_ids = self._frame_ids()
+        topleft = (self.positions[:n] -
+                   self.frame_half_sizes[frame_ids]).astype(np.int32)
+        positions = zip(topleft[:, 0].tolist(), topleft[:, 1].tolist())
+
+        self.screen.blits(zip(map(self.frames.__getitem__, frame_ids.tolist()),
+                              positions),
+                          doreturn=False)
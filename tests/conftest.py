@@ -0,0 +1,16 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import pytest
+
+from src.game import Game
+
+
+@pytest.fixture
+def game():
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+    yield Game(screen)
+    pygame.quit()
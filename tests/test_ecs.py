@@ -0,0 +1,104 @@
+import pygame
+
+from src.components import Transform, Velocity, ParticleEmitter, Sprite, Animation, State
+from src.ecs import ChangeTracker, Entity, System, changed
+from src.entitys import Effect
+from src.game import Game
+
+
+def make_moving_entity(pos: tuple = (100, 100)) -> Entity:
+    entity = Entity()
+    entity.add_component(Transform(rect=pygame.Rect(pos, (10, 10))))
+    velocity = Velocity(600)
+    velocity.direction = pygame.Vector2(1, 0)
+    entity.add_component(velocity)
+    return entity
+
+
+def test_entity_built_before_adding_is_processed(game):
+    entity = make_moving_entity()
+    for _ in range(3):
+        game.update(1 / 60)
+
+    game.add_entity(entity)
+    game.update(1 / 60)
+
+    assert entity.get_component(Transform).hitbox.x > 100
+
+
+def test_new_entities_pass_filters_only_on_first_run():
+    tracker = ChangeTracker()
+    system = System()
+    system.tracker = tracker
+    entity = make_moving_entity()
+
+    system.register_entity(entity)
+    assert system.query(changed(Velocity)) == [entity]
+
+    system.run(0)
+    assert system.query(changed(Velocity)) == []
+
+    entity.tracker = tracker
+    entity.mark_changed(Velocity)
+    assert system.query(changed(Velocity)) == [entity]
+
+
+def test_velocity_assignment_is_tracked(game):
+    entity = make_moving_entity()
+    entity.get_component(Velocity).direction = pygame.Vector2(0, 0)
+    game.add_entity(entity)
+    game.update(1 / 60)
+
+    entity.get_component(Velocity).direction = pygame.Vector2(1, 0)
+    game.update(1 / 60)
+    game.update(1 / 60)
+
+    assert entity.get_component(Transform).hitbox.x > 100
+
+
+def test_new_entities_without_queried_component_are_skipped(game):
+    entity = Entity()
+    entity.add_component(Sprite())
+    entity.add_component(Transform(rect=pygame.Rect(0, 0, 32, 32)))
+    entity.add_component(Animation({}))
+    game.add_entity(entity)
+    animation_system = game.systems[3]
+
+    assert animation_system.query(changed(State)) == []
+    game.update(1 / 60)
+
+
+def test_games_have_separate_trackers(game):
+    game.add_entity(make_moving_entity())
+    game.update(1 / 60)
+
+    other = Game(game.screen)
+
+    assert other.tracker is not game.tracker
+    assert other.tracker.tick == 1
+    assert other.tracker.changed == {}
+
+
+def test_shared_component_is_recorded_for_every_entity(game):
+    emitter = ParticleEmitter()
+    first, second = Effect(emitter), Effect(emitter)
+    game.add_entity(first)
+    game.add_entity(second)
+
+    first.mark_changed(ParticleEmitter)
+    second.mark_changed(ParticleEmitter)
+
+    log = game.tracker.changed[ParticleEmitter]
+    assert first in log and second in log
+
+
+def test_removed_entity_is_dropped_from_logs(game):
+    entity = make_moving_entity()
+    game.add_entity(entity)
+    entity.mark_changed(Transform)
+
+    game.remove_entity(entity)
+
+    assert entity not in game.tracker.changed[Transform]
+    assert all(entity not in system.entities for system in game.systems)
+
@@ -0,0 +1,132 @@
+import numpy as np
+import pygame
+import pytest
+
+from src.components import ParticleEmitter
+from src.entitys import Effect
+from src.sprite_utils import SpriteLoader
+from src.systems import ParticleSystem
+
+
+def make_system(capacity: int = 100) -> ParticleSystem:
+    system = ParticleSystem(pygame.Surface((200, 200)), capacity=capacity)
+    system.rng = np.random.default_rng(0)
+    return system
+
+
+def make_effect(system: ParticleSystem, **kwargs) -> Effect:
+    emitter_args = {'rate': 0, 'lifetime': (10, 10), 'speed': (0, 0)}
+    emitter_args.update(kwargs)
+    effect = Effect(ParticleEmitter(**emitter_args), (100, 100))
+    system.register_entity(effect)
+    return effect
+
+
+def test_rate_accumulates_between_updates():
+    system = make_system()
+    make_effect(system, rate=30)
+
+    system.update(1 / 60)
+    assert system.count == 0
+
+    system.update(1 / 60)
+    assert system.count == 1
+
+
+def test_burst_spawns_once_even_if_inactive():
+    system = make_system()
+    effect = make_effect(system)
+    emitter = effect.get_component(ParticleEmitter)
+    emitter.active = False
+    emitter.burst = 5
+
+    system.update(1 / 60)
+    system.update(1 / 60)
+
+    assert system.count == 5
+    assert emitter.burst == 0
+
+
+def test_spawning_stops_at_capacity():
+    system = make_system(capacity=10)
+    make_effect(system).get_component(ParticleEmitter).burst = 25
+
+    system.update(1 / 60)
+
+    assert system.count == 10
+
+
+def test_dead_particles_are_removed_and_survivors_keep_data():
+    system = make_system()
+    make_effect(system, frames=[pygame.Surface((2, 2))], speed=(10, 50)).get_component(
+        ParticleEmitter).burst = 3
+    make_effect(system, frames=[pygame.Surface((4, 4))], speed=(10, 50)).get_component(
+        ParticleEmitter).burst = 3
+    system.update(0)
+    system.lifetimes[:6] = [1, 0.1, 1, 0.1, 1, 1]
+    survivors = [0, 2, 4, 5]
+    positions = system.positions[survivors] + system.velocities[survivors] * 0.5
+    velocities = system.velocities[survivors].copy()
+    frame_starts = system.frame_starts[survivors].copy()
+
+    system._update_particles(0.5)
+
+    assert system.count == 4
+    np.testing.assert_allclose(system.positions[:4], positions)
+    np.testing.assert_array_equal(system.velocities[:4], velocities)
+    np.testing.assert_array_equal(system.frame_starts[:4], frame_starts)
+
+
+def test_frames_are_picked_by_age():
+    system = make_system()
+    frames = [pygame.Surface((2, 2)) for _ in range(4)]
+    make_effect(system, frames=frames, lifetime=(1, 1)).get_component(
+        ParticleEmitter).burst = 1
+    system.update(0)
+    start = system.frame_starts[0]
+
+    ids = []
+    for _ in range(4):
+        ids.append(int(system._frame_ids()[0]) - start)
+        system._update_particles(0.3)
+
+    assert ids == [0, 1, 2, 3]
+
+
+def test_non_positive_lifetime_is_rejected():
+    with pytest.raises(ValueError):
+        ParticleEmitter(lifetime=(0, 0))
+
+
+def test_default_emitters_share_frames(game):
+    for _ in range(10):
+        game.add_entity(Effect(ParticleEmitter(color=(255, 0, 0))))
+
+    particle_system = game.systems[-1]
+    assert len(particle_system.frames) == 1
+
+
+def test_frames_are_released_after_last_particle_dies():
+    system = make_system()
+    frames = [pygame.Surface((2, 2)), pygame.Surface((2, 2))]
+    effect = make_effect(system, frames=frames, lifetime=(1, 1))
+    effect.get_component(ParticleEmitter).burst = 1
+    system.update(0)
+
+    system.unregister_entity(effect)
+    system.update(0.5)
+    assert system.frames == frames
+
+    system.update(0.6)
+    assert system.frames == [None, None]
+
+    make_effect(system, frames=[pygame.Surface((3, 3))])
+    assert len(system.frames) == 2
+    assert system.frame_half_sizes[0].tolist() == [1.5, 1.5]
+
+
+def test_cached_folder_frames_are_copied(game):
+    frames = SpriteLoader.load_folder_frames('assets/images/player/right')
+    frames.clear()
+
+    assert SpriteLoader.load_folder_frames('assets/images/player/right')
@@ -0,0 +1,81 @@
+import pygame
+
+from src.components import Transform, Velocity, State, Sprite, Animation, Collider
+from src.ecs import Entity
+from src.entitys import Obstacle
+from src.sprite_utils import AnimationData
+
+
+def make_actor(pos: tuple = (100, 100), direction: tuple = (0, 0)) -> Entity:
+    entity = Entity()
+    entity.add_component(Sprite(size=(10, 10)))
+    entity.add_component(Transform(rect=pygame.Rect(pos, (10, 10))))
+    velocity = Velocity(600)
+    velocity.direction = pygame.Vector2(direction)
+    entity.add_component(velocity)
+    entity.add_component(Collider())
+    entity.add_component(State({'idle': True, 'moving': None}))
+    return entity
+
+
+def test_state_and_animation_follow_velocity_change(game):
+    entity = make_actor()
+    idle_frame = pygame.Surface((10, 10))
+    right_frame = pygame.Surface((10, 10))
+    entity.add_component(Animation({
+        'idle': AnimationData([idle_frame]),
+        'move_right': AnimationData([right_frame]),
+    }))
+    game.add_entity(entity)
+    game.update(1 / 60)
+
+    assert entity.get_component(Animation).current_animation == 'idle'
+    assert entity.get_component(Sprite).surface is idle_frame
+
+    entity.get_component(Velocity).direction = pygame.Vector2(1, 0)
+    game.update(1 / 60)
+
+    assert entity.get_component(State).states == {'idle': False, 'moving': {'right'}}
+    assert entity.get_component(Animation).current_animation == 'move_right'
+    assert entity.get_component(Sprite).surface is right_frame
+
+
+def test_collisions_are_detected_only_for_moved_entities(game):
+    mover = make_actor(pos=(100, 100), direction=(1, 0))
+    idle = make_actor(pos=(100, 500))
+    game.add_entity(mover)
+    game.add_entity(idle)
+    game.add_entity(Obstacle(None, (50, 50), (140, 105)))
+    game.add_entity(Obstacle(None, (50, 50), (140, 505)))
+    detection_system = game.systems[4]
+
+    colliding = set()
+    for _ in range(10):
+        game.update(1 / 60)
+        colliding.update(event.entity_a for event in detection_system.events)
+
+    assert colliding == {mover}
+
+
+def test_stopped_entity_leaves_and_rejoins_moving(game):
+    entity = make_actor(direction=(1, 0))
+    game.add_entity(entity)
+    movement_system = game.systems[1]
+    velocity = entity.get_component(Velocity)
+    transform = entity.get_component(Transform)
+
+    game.update(1 / 60)
+    assert entity in movement_system.moving
+
+    velocity.direction = pygame.Vector2(0, 0)
+    game.update(1 / 60)
+    assert entity not in movement_system.moving
+
+    stopped_x = transform.hitbox.x
+    game.update(1 / 60)
+    assert transform.hitbox.x == stopped_x
+
+    velocity.direction = pygame.Vector2(1, 0)
+    game.update(1 / 60)
+    assert entity in movement_system.moving
+    assert transform.hitbox.x > stopped_x